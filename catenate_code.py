@@ -1,46 +1,416 @@
 #!/usr/bin/env python
 import os
+import sys
 import argparse
+import contextlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import repeat
 
-def find_code_files(directory, extensions):
+try:
+    import pathspec
+except ImportError:
+    # Optional: only used to honor the project's .gitignore
+    pathspec = None
+
+# Directories that hold tooling, dependencies or build output rather than
+# project code; find_code_files doesn't descend into them by default.
+DEFAULT_SKIP_DIRS = frozenset({
+    '.git', 'node_modules', '__pycache__', '.venv', 'venv', '.mypy_cache',
+    '.tox', 'dist', 'build', '.pytest_cache',
+})
+
+# The fixed parts of the header that precedes each file's content.
+_HDR_PRE = b"\n\n$$NEWFILE$$ "
+_HDR_SUF = b"\n\n"
+
+# Number of threads used to scan directories in parallel.
+_WALK_WORKERS = 16
+
+# Each level of the tree is split into about this many batches per thread,
+# so the pool's per-task overhead is paid per batch rather than per directory.
+_WALK_BATCHES_PER_WORKER = 4
+
+# Upper bound on threads (and so open files) used to read files in parallel.
+_READ_WORKERS = 32
+
+# How many files write_concatenated opens ahead of the one it is copying,
+# so the kernel can read them in while earlier ones are being written.
+_PREFETCH_DEPTH = 8
+
+# Size of the buffer write_concatenated copies through when it can't use sendfile.
+_COPY_BUFSIZE = 1 << 20
+
+# From this many extensions on, looking up a name's suffix in a set beats
+# str.endswith over the whole tuple.
+_SUFFIX_SET_MIN_EXTENSIONS = 16
+
+def _load_gitignore(directory):
+    """
+    Loads the .gitignore at the root of the directory, if there is one
+    and pathspec is installed.
+
+    Args:
+    - directory (str): The directory to look in.
+
+    Returns:
+    - Optional[pathspec.GitIgnoreSpec]: The parsed patterns, or None.
+    """
+    if pathspec is None:
+        return None
+    try:
+        with open(os.path.join(directory, '.gitignore'), 'r') as file:
+            return pathspec.GitIgnoreSpec.from_lines(file)
+    except OSError:
+        return None
+
+def _suffix_set(ext_tuple):
+    """
+    Builds a set of suffixes for matching file names against many extensions.
+
+    Args:
+    - ext_tuple (Tuple[str, ...]): File extensions to search for.
+
+    Returns:
+    - Optional[FrozenSet[str]]: The extensions without their leading dot, or
+      None when there are too few of them, or any of them isn't a plain
+      ".ext", for the set to match the same names as str.endswith.
+    """
+    if len(ext_tuple) < _SUFFIX_SET_MIN_EXTENSIONS:
+        return None
+    if not all(ext.startswith('.') and ext.count('.') == 1 for ext in ext_tuple):
+        return None
+    return frozenset(ext[1:] for ext in ext_tuple)
+
+def _scan_dirs(paths, ext_tuple, suffix_set, skip_dirs, skip_hidden, ignore_spec, prefix_len):
+    """
+    Scans a batch of directories without recursing into them.
+
+    Args:
+    - paths (List[str]): The directories to scan.
+    - ext_tuple (Tuple[str, ...]): File extensions to search for.
+    - suffix_set (Optional[FrozenSet[str]]): The same extensions as built by
+      _suffix_set, used instead of ext_tuple when not None.
+    - skip_dirs (Set[str]): Names of directories not to descend into.
+    - skip_hidden (bool): Whether to skip directories whose name starts with a dot.
+    - ignore_spec (Optional[pathspec.PathSpec]): Patterns of paths to leave out.
+    - prefix_len (int): Length of the root path prefix, used to get the
+      relative paths that ignore_spec matches against.
+
+    Returns:
+    - Tuple[List[str], List[Tuple[str, int]]]: The full paths of the
+      subdirectories to descend into, and the full paths and sizes of the
+      matching files.
+    """
+    subdirs = []
+    matching_files = []
+    for path in paths:
+        try:
+            it = os.scandir(path)
+        except OSError:
+            # Unreadable directories are skipped, as os.walk does by default
+            continue
+        with it:
+            while True:
+                # Only listing errors end the directory early (as in os.walk);
+                # every per-entry check below handles its own errors, so one
+                # bad entry never loses its siblings
+                try:
+                    entry = next(it)
+                except StopIteration:
+                    break
+                except OSError:
+                    break
+                # d_type from the directory listing answers both checks
+                # without a stat, except for symlinks, which only get
+                # followed (by is_file) when their name matches
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    is_dir = False
+                name = entry.name
+                if is_dir:
+                    if name in skip_dirs or (skip_hidden and name.startswith('.')):
+                        continue
+                    if ignore_spec is not None and ignore_spec.match_file(entry.path[prefix_len:] + '/'):
+                        continue
+                    subdirs.append(entry.path)
+                    continue
+                if suffix_set is None:
+                    if not name.endswith(ext_tuple):
+                        continue
+                else:
+                    dot = name.rfind('.')
+                    if dot == -1 or name[dot + 1:] not in suffix_set:
+                        continue
+                # Broken, looping or inaccessible symlinks are skipped
+                try:
+                    if not entry.is_file():
+                        continue
+                except OSError:
+                    continue
+                if ignore_spec is not None and ignore_spec.match_file(entry.path[prefix_len:]):
+                    continue
+                # One stat per match, reused when the file is read
+                try:
+                    size = entry.stat().st_size
+                except OSError:
+                    continue
+                matching_files.append((entry.path, size))
+    return subdirs, matching_files
+
+def find_code_files(directory, extensions, skip_dirs=DEFAULT_SKIP_DIRS, skip_hidden=True):
     """
     Recursively finds all files with the given extensions in the specified directory.
 
+    Directories named in skip_dirs, hidden directories and anything matched
+    by the directory's .gitignore (when pathspec is installed) are pruned
+    without being walked.
+
     Args:
     - directory (str): The directory to search in.
     - extensions (List[str]): List of file extensions to search for.
+    - skip_dirs (Set[str]): Names of directories not to descend into.
+    - skip_hidden (bool): Whether to skip directories whose name starts with a dot.
 
     Returns:
-    - List[str]: A list of file paths relative to the project root.
+    - List[Tuple[str, int]]: The path relative to the project root and the
+      size in bytes of each file found.
+    """
+    # str.endswith takes a tuple and checks every suffix in one call
+    ext_tuple = tuple(extensions)
+    suffix_set = _suffix_set(ext_tuple)
+    # Walking from a normalized root means every path found starts with it,
+    # so relative paths are a plain slice instead of os.path.relpath
+    root = os.path.abspath(directory)
+    prefix_len = len(root.rstrip(os.sep)) + 1
+    ignore_spec = _load_gitignore(root)
+    matching_files = []
+    pending = [root]
+    with ThreadPoolExecutor(max_workers=_WALK_WORKERS) as executor:
+        # Scan one level of the tree at a time so the output order is stable
+        while pending:
+            batch_size = -(-len(pending) // (_WALK_WORKERS * _WALK_BATCHES_PER_WORKER))
+            batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+            results = executor.map(
+                _scan_dirs, batches, repeat(ext_tuple), repeat(suffix_set), repeat(skip_dirs),
+                repeat(skip_hidden), repeat(ignore_spec), repeat(prefix_len),
+            )
+            pending = []
+            for subdirs, files in results:
+                pending.extend(subdirs)
+                matching_files.extend(files)
+    return [(path[prefix_len:], size) for path, size in matching_files]
+
+def _advise(fd):
     """
-    code_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if any(file.endswith(ext) for ext in extensions):
-                relative_path = os.path.relpath(os.path.join(root, file), directory)
-                code_files.append(relative_path)
-    return code_files
+    Tells the kernel a file is about to be read from start to end, so it
+    reads ahead aggressively and starts loading it into the page cache.
+
+    Args:
+    - fd (int): The open file's descriptor.
+    """
+    if not hasattr(os, 'posix_fadvise'):
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_SEQUENTIAL)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        # Only a hint; some file systems don't support it
+        pass
+
+def _open_ahead(paths, depth=_PREFETCH_DEPTH):
+    """
+    Opens files in order for reading, keeping up to depth of them open and
+    prefetching ahead of the one handed out.
+
+    Args:
+    - paths (Iterable[str]): The files to open.
+    - depth (int): How many files to keep open ahead.
+
+    Yields:
+    - io.FileIO: Each file, unbuffered; the caller is responsible for closing it.
+
+    Raises:
+    - OSError: When the file about to be handed out couldn't be opened. The
+      error is held back until that file's turn, so the files before it are
+      still handed out.
+    """
+    window = deque()
+    try:
+        for path in paths:
+            try:
+                infile = open(path, 'rb', buffering=0)
+            except OSError as err:
+                window.append(err)
+            else:
+                window.append(infile)
+                _advise(infile.fileno())
+            if len(window) > depth:
+                item = window.popleft()
+                if isinstance(item, OSError):
+                    raise item
+                yield item
+        while window:
+            item = window.popleft()
+            if isinstance(item, OSError):
+                raise item
+            yield item
+    finally:
+        for item in window:
+            if not isinstance(item, OSError):
+                item.close()
+
+def _read_into(path, dest):
+    """
+    Reads a file into a pre-allocated buffer.
+
+    Args:
+    - path (str): The file to read.
+    - dest (memoryview): The buffer to fill, sized to the file.
+
+    Returns:
+    - int: The number of bytes read, which is short if the file shrank.
+    """
+    total = 0
+    with open(path, 'rb', buffering=0) as infile:
+        while total < len(dest):
+            n = infile.readinto(dest[total:])
+            if not n:
+                break
+            total += n
+    return total
 
 def concatenate_files(files, project_root):
     """
-    Concatenates the content of the files into a single string, 
+    Concatenates the content of the files into a single buffer, 
     with each file's content preceded by a header with the file's relative path.
 
+    The sizes found during the walk let the output be assembled in one
+    pre-sized buffer, with each file read straight into its slot by a
+    pool of threads.
+
     Args:
-    - files (List[str]): List of relative file paths to concatenate.
+    - files (List[Tuple[str, int]]): Relative file paths and sizes to
+      concatenate, as returned by find_code_files.
     - project_root (str): The root directory of the project.
 
     Returns:
-    - str: The concatenated output as a single string.
+    - bytearray: The concatenated output as raw bytes; decode it only if
+      a string is really needed.
+    """
+    paths = [os.path.join(project_root, file) for file, _ in files]
+    sizes = [size for _, size in files]
+    headers = [_HDR_PRE + os.fsencode(file) + _HDR_SUF for file, _ in files]
+    buf = bytearray(sum(map(len, headers)) + sum(sizes) + len(files))
+
+    # The file count is known, so the span table is sized up front too
+    spans = [None] * len(files)
+    offset = 0
+    with memoryview(buf) as view:
+        for i, (header, size) in enumerate(zip(headers, sizes)):
+            view[offset:offset + len(header)] = header
+            offset += len(header)
+            spans[i] = (offset, size)
+            offset += size
+            view[offset:offset + 1] = b"\n"  # Add a newline after each file's content
+            offset += 1
+
+        # read() releases the GIL, so the files can be read concurrently
+        dests = [view[start:start + size] for start, size in spans]
+        with ThreadPoolExecutor(max_workers=min(_READ_WORKERS, len(files)) or 1) as executor:
+            counts = list(executor.map(_read_into, paths, dests))
+        for dest in dests:
+            dest.release()
+
+    # Close the gap left by any file that shrank since the walk
+    for (start, size), n in zip(reversed(spans), reversed(counts)):
+        if n < size:
+            del buf[start + n:start + size]
+    return buf
+
+def iter_concatenated(files, project_root):
+    """
+    Yields the same output as concatenate_files, one chunk at a time,
+    so callers can stream it without holding the whole payload in memory.
+
+    Args:
+    - files (List[Tuple[str, int]]): Relative file paths and sizes to
+      concatenate, as returned by find_code_files.
+    - project_root (str): The root directory of the project.
+
+    Yields:
+    - bytes-like: Alternating header, file content and trailing newline
+      chunks. File contents are bytearrays, so convert one with bytes()
+      before hashing or storing it.
+    """
+    for file, size in files:
+        yield _HDR_PRE + os.fsencode(file) + _HDR_SUF
+        content = bytearray(size)
+        with memoryview(content) as dest:
+            n = _read_into(os.path.join(project_root, file), dest)
+        del content[n:]
+        yield content
+        yield b"\n"  # Add a newline after each file's content
+
+def _copy_file(infile, size, out, buf):
+    """
+    Copies the content of an open file to a binary output stream,
+    in-kernel via os.sendfile when both ends support it.
+
+    Args:
+    - infile (io.FileIO): The file to copy from.
+    - size (int): The size of the file, as found during the walk.
+    - out (io.BufferedIOBase): The binary stream to copy to.
+    - buf (bytearray): Scratch buffer for when sendfile can't be used,
+      reused across files.
     """
-    output = []
-    for file in files:
-        header = f"\n\n$$NEWFILE$$ {file}\n\n"
-        output.append(header)
-        with open(os.path.join(project_root, file), 'r') as infile:
-            output.append(infile.read())
-            output.append("\n")  # Add a newline after each file's content
-    return ''.join(output)
+    if hasattr(os, 'sendfile'):
+        offset = 0
+        try:
+            out_fd = out.fileno()
+            out.flush()  # Anything already buffered has to go out first
+            while offset < size:
+                sent = os.sendfile(out_fd, infile.fileno(), offset, size - offset)
+                if not sent:
+                    break
+                offset += sent
+            return
+        except OSError:
+            # Nothing has been sent yet, so the plain copy below can take over
+            if offset:
+                raise
+    # Stop at the walk-time size too, so a file that grew since is cut
+    # exactly where sendfile and the other writers cut it
+    copied = 0
+    with memoryview(buf) as view:
+        while copied < size:
+            n = infile.readinto(view[:min(len(view), size - copied)])
+            if not n:
+                break
+            out.write(view[:n])
+            copied += n
+
+def write_concatenated(files, project_root, out):
+    """
+    Writes the same output as concatenate_files to a binary stream
+    without reading file contents into Python.
+
+    Args:
+    - files (List[Tuple[str, int]]): Relative file paths and sizes to
+      concatenate, as returned by find_code_files.
+    - project_root (str): The root directory of the project.
+    - out (io.BufferedIOBase): The binary stream to write to.
+    """
+    buf = bytearray(_COPY_BUFSIZE)
+    paths = (os.path.join(project_root, file) for file, _ in files)
+    # Closing the pipeline on the way out also closes the files it opened ahead
+    with contextlib.closing(_open_ahead(paths)) as infiles:
+        for (file, size), infile in zip(files, infiles):
+            out.write(_HDR_PRE + os.fsencode(file) + _HDR_SUF)
+            with infile:
+                _copy_file(infile, size, out, buf)
+            out.write(b"\n")  # Add a newline after each file's content
 
 def main():
     parser = argparse.ArgumentParser(description="Recursively concatenate code files with specified extensions.")
@@ -52,11 +422,11 @@ def main():
     # Find all code files with the specified extensions
     code_files = find_code_files(args.directory, args.extensions)
     
-    # Concatenate all files
-    output = concatenate_files(code_files, args.directory)
-    
-    # Output to STDOUT
-    print(output)
+    # Concatenate all files, streaming them to STDOUT
+    out = sys.stdout.buffer
+    write_concatenated(code_files, args.directory, out)
+    out.write(b"\n")
+    out.flush()
 
 if __name__ == "__main__":
     main()
@@ -2,39 +2,97 @@
 import os
 import json
 import argparse
+import functools
+import itertools
+from concurrent.futures import ThreadPoolExecutor
 import requests
-from catenate_code import find_code_files, concatenate_files
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from catenate_code import find_code_files, iter_concatenated
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+def _create_session():
+    """
+    Create the HTTP session shared by all requests to the LLM, so the
+    connection (and its TLS handshake) is reused between calls.
+    """
+    session = requests.Session()
+    # POST isn't retried on read errors or statuses by default, so only
+    # failures to connect are retried, before any of the body is sent
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=4, max_retries=Retry(total=3, backoff_factor=0.5))
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["Content-Type"] = "application/json"
+    return session
+
+_SESSION = _create_session()
+
+def _json_dumps(obj):
+    """Serialize obj to JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode('utf-8')
+
+@functools.lru_cache(maxsize=None)
 def load_config(config_file):
-    """Load configuration from a JSON file."""
-    if os.path.exists(config_file):
-        with open(config_file, 'r') as file:
-            return json.load(file)
-    return {}
+    """
+    Load configuration from a JSON file.
+    Results are cached per path, so treat the returned dict as read-only.
+    """
+    try:
+        with open(config_file, 'rb') as file:
+            return json.loads(file.read())
+    except (FileNotFoundError, NotADirectoryError):
+        # Same as the old os.path.exists check: no such file means no config
+        return {}
 
 def construct_prompt(code, user_query):
     """
     Construct the system and user prompts for the LLM.
+    The code is an iterable of chunks, and the user prompt is returned
+    as an iterator over its pieces so it can be streamed to the LLM.
     """
     system_prompt = "You are an assistant specialized in code analysis and modifications."
-    user_prompt = f"{user_query}\n\nHere is every file in the codebase to consider, catenated together into one payload. Each file is seperated by a header of two newlines, a $$NEWFILE$$ token with the relative path and filename, and then two more newlines:\n{code}"
+    user_prompt_head = f"{user_query}\n\nHere is every file in the codebase to consider, catenated together into one payload. Each file is seperated by a header of two newlines, a $$NEWFILE$$ token with the relative path and filename, and then two more newlines:\n"
+    user_prompt = itertools.chain([user_prompt_head], code)
     
     return system_prompt, user_prompt
 
+def _iter_request_body(model, system_prompt, user_prompt):
+    """
+    Yield the JSON request body in pieces, encoding the user prompt
+    chunk by chunk so the full payload is never held in memory.
+    """
+    yield (
+        b'{"model": ' + _json_dumps(model)
+        + b', "messages": [{"role": "system", "content": ' + _json_dumps(system_prompt)
+        + b'}, {"role": "user", "content": "'
+    )
+    for chunk in user_prompt:
+        if isinstance(chunk, (bytes, bytearray)):
+            chunk = chunk.decode('utf-8', errors='replace')
+        # An empty chunk would end a chunked transfer early
+        if chunk:
+            # Drop the surrounding quotes to splice the escaped text into the string
+            yield _json_dumps(chunk)[1:-1]
+    yield b'"}]}'
+
 def send_request(api_url, api_key, model, system_prompt, user_prompt):
     """
     Send the prompt to the LLM and return the response.
+    The user prompt may be a string or an iterable of str or bytes chunks,
+    which is streamed as the request body.
     """
-    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
-    payload = {
-        "model": model,
-        "messages": [
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ]
-    }
+    if isinstance(user_prompt, str):
+        user_prompt = [user_prompt]
+    headers = {"Authorization": f"Bearer {api_key}"}
+    body = _iter_request_body(model, system_prompt, user_prompt)
     
-    response = requests.post(api_url, headers=headers, json=payload)
+    response = _SESSION.post(api_url, headers=headers, data=body)
     
     # Check for errors and print more detailed error information
     try:
@@ -46,20 +104,38 @@ def send_request(api_url, api_key, model, system_prompt, user_prompt):
     
     return response.json()
 
+@functools.lru_cache(maxsize=None)
+def _ensure_dir(path):
+    """
+    Create a directory if needed, only once per path for the process.
+    """
+    os.makedirs(path, exist_ok=True)
+
+def _write_file(path, content):
+    """
+    Write already-encoded content to a file.
+    """
+    with open(path, 'wb') as file:
+        file.write(content)
+
 def save_diffs(diffs, output_dir):
     """
     Save the diffs to files in the specified output directory.
     """
-    os.makedirs(output_dir, exist_ok=True)
+    _ensure_dir(output_dir)
+    # Keyed by path so that, as when writing in order, the last diff with a
+    # given name wins, and no two writers ever share a file
+    contents = {}
     for diff in diffs:
         # Extract the file path and create a sensible name for the diff file
         file_path = diff.get("file_path", "unknown_file")
         summary = diff.get("summary", "changes").replace(" ", "_")[:50]
         diff_filename = f"{os.path.basename(file_path)}_{summary}.diff"
         diff_filepath = os.path.join(output_dir, diff_filename)
-        
-        with open(diff_filepath, 'w') as file:
-            file.write(diff.get("diff_content", ""))
+        contents[diff_filepath] = diff.get("diff_content", "").encode('utf-8')
+    
+    with ThreadPoolExecutor() as executor:
+        list(executor.map(_write_file, contents.keys(), contents.values()))
 
 def main():
     parser = argparse.ArgumentParser(description="Automate code analysis and changes using LLMs.")
@@ -104,7 +180,7 @@ def main():
 
     # Get code files and concatenate them
     code_files = find_code_files(directory, extensions)
-    code = concatenate_files(code_files, directory)
+    code = iter_concatenated(code_files, directory)
     
     # Construct the prompt
     system_prompt, user_prompt = construct_prompt(code, query)